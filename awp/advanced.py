@@ -3,8 +3,10 @@
 from __future__ import annotations
 
 import random
+from collections import Counter
 from dataclasses import dataclass
-from typing import Dict, List, Optional
+from math import gcd
+from typing import Callable, Dict, List, Optional, Tuple
 
 import networkx as nx
 
@@ -12,7 +14,7 @@ from .config import AdvancedQuestionConfig, Config, MultiHopConfig
 from .scenario import Agent, Scenario
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class GeneratedQuestion:
     question_type: str
     text: str
@@ -21,13 +23,25 @@ class GeneratedQuestion:
     complexity_multiplier: float
 
 
+def _collect_handlers(generator: object) -> Dict[str, Callable[..., Optional[GeneratedQuestion]]]:
+    """Map question types to ``_handle_<type>`` methods once per generator."""
+
+    prefix = "_handle_"
+    return {
+        name[len(prefix):]: getattr(generator, name)
+        for name in dir(generator)
+        if name.startswith(prefix)
+    }
+
+
 class AdvancedQuestionGenerator:
     def __init__(self, config: Config, rng: random.Random) -> None:
         self.cfg: AdvancedQuestionConfig = config.advanced_questions
         self.rng = rng
+        self._handlers = _collect_handlers(self)
 
     def generate(self, qtype: str, scenario: Scenario, agent: Agent, obj: str) -> Optional[GeneratedQuestion]:
-        handler = getattr(self, f"_handle_{qtype}", None)
+        handler = self._handlers.get(qtype)
         if not handler:
             return None
         return handler(scenario, agent, obj)
@@ -51,14 +65,7 @@ class AdvancedQuestionGenerator:
 
     def _handle_temporal_after_step(self, scenario: Scenario, agent: Agent, obj: str) -> Optional[GeneratedQuestion]:
         step = self.rng.randint(1, max(1, len(scenario.transfers)))
-        count = agent.initial_inventory.get(obj, 0)
-        for transfer in scenario.transfers[:step]:
-            if transfer.object_type != obj:
-                continue
-            if transfer.from_agent == agent.name:
-                count -= transfer.quantity
-            elif transfer.to_agent == agent.name:
-                count += transfer.quantity
+        count = self._count_after_step(scenario, agent, obj, step)
         text = f"How many {obj} does {agent.name} have after step {step}?"
         return self._wrap("temporal_after_step", text, count, {"step": step})
 
@@ -79,26 +86,39 @@ class AdvancedQuestionGenerator:
         return self._wrap("multi_agent_combined", text, total, {"agents": names})
 
     def _handle_ratio_fraction(self, scenario: Scenario, agent: Agent, obj: str) -> Optional[GeneratedQuestion]:
-        total = sum(a.final_inventory.get(obj, 0) for a in scenario.agents)
-        part = agent.final_inventory.get(obj, 0)
+        part, total = self._share(scenario, agent, obj)
         if total == 0:
             answer = "0/1"
         else:
-            from math import gcd
-
             divisor = gcd(part, total) or 1
             answer = f"{part // divisor}/{total // divisor}"
         text = f"What fraction of all {obj} does {agent.name} hold?"
         return self._wrap("ratio_fraction", text, answer)
 
     def _handle_ratio_percentage(self, scenario: Scenario, agent: Agent, obj: str) -> Optional[GeneratedQuestion]:
-        total = sum(a.final_inventory.get(obj, 0) for a in scenario.agents)
-        part = agent.final_inventory.get(obj, 0)
+        part, total = self._share(scenario, agent, obj)
         pct = 0.0 if total == 0 else (part / total * 100)
         text = f"What percentage of all {obj} does {agent.name} have?"
         return self._wrap("ratio_percentage", text, f"{pct:.1f}%")
 
     # ------------------------------------------------------------------
+    @staticmethod
+    def _count_after_step(scenario: Scenario, agent: Agent, obj: str, step: int) -> int:
+        count = agent.initial_inventory.get(obj, 0)
+        for transfer in scenario.transfers[:step]:
+            if transfer.object_type != obj:
+                continue
+            if transfer.from_agent == agent.name:
+                count -= transfer.quantity
+            elif transfer.to_agent == agent.name:
+                count += transfer.quantity
+        return count
+
+    @staticmethod
+    def _share(scenario: Scenario, agent: Agent, obj: str) -> Tuple[int, int]:
+        total = sum(a.final_inventory.get(obj, 0) for a in scenario.agents)
+        return agent.final_inventory.get(obj, 0), total
+
     def _another_agent(self, scenario: Scenario, agent: Agent) -> Optional[Agent]:
         others = [a for a in scenario.agents if a.name != agent.name]
         return self.rng.choice(others) if others else None
@@ -115,12 +135,22 @@ class AdvancedQuestionGenerator:
 
 
 class MultiHopQuestionGenerator:
+    MULTIPLIER_KEYS = {
+        "multi_hop_indirect": "intermediate_state",
+        "multi_hop_net_flow": "path_sum",
+        "multi_hop_path_count": "net_change_chain",
+        "multi_hop_multi_step": "agent_final_after_chain",
+    }
+
     def __init__(self, config: Config, rng: random.Random) -> None:
         self.cfg: MultiHopConfig = config.multi_hop
         self.rng = rng
+        self._handlers = _collect_handlers(self)
+        self._paths_scenario: Optional[Scenario] = None
+        self._paths_by_obj: Dict[str, List[List[tuple]]] = {}
 
     def generate(self, qtype: str, scenario: Scenario, obj: str) -> Optional[GeneratedQuestion]:
-        handler = getattr(self, f"_handle_{qtype}", None)
+        handler = self._handlers.get(qtype)
         if not handler:
             return None
         return handler(scenario, obj)
@@ -138,8 +168,14 @@ class MultiHopQuestionGenerator:
 
     def _handle_multi_hop_net_flow(self, scenario: Scenario, obj: str) -> Optional[GeneratedQuestion]:
         agent = self.rng.choice(scenario.agents)
-        inflow = sum(t.quantity for t in scenario.transfers if t.to_agent == agent.name and t.object_type == obj)
-        outflow = sum(t.quantity for t in scenario.transfers if t.from_agent == agent.name and t.object_type == obj)
+        inflow = outflow = 0
+        for transfer in scenario.transfers:
+            if transfer.object_type != obj:
+                continue
+            if transfer.to_agent == agent.name:
+                inflow += transfer.quantity
+            if transfer.from_agent == agent.name:
+                outflow += transfer.quantity
         text = f"What is the net flow of {obj} through {agent.name} (incoming minus outgoing)?"
         return self._wrap("multi_hop_net_flow", text, inflow - outflow, hops=2)
 
@@ -147,11 +183,7 @@ class MultiHopQuestionGenerator:
         paths = self._all_paths(scenario, obj)
         if not paths:
             return None
-        unique_pairs = {}
-        for path in paths:
-            key = (path[0][0], path[-1][1])
-            unique_pairs.setdefault(key, 0)
-            unique_pairs[key] += 1
+        unique_pairs = Counter((path[0][0], path[-1][1]) for path in paths)
         (start, end), count = self.rng.choice(list(unique_pairs.items()))
         text = f"How many distinct paths move {obj} from {start} to {end}?"
         return self._wrap("multi_hop_path_count", text, count, hops=self.cfg.max_hops)
@@ -165,6 +197,16 @@ class MultiHopQuestionGenerator:
 
     # ------------------------------------------------------------------
     def _all_paths(self, scenario: Scenario, obj: str) -> List[List[tuple]]:
+        """Simple transfer paths for ``obj``, enumerated once per scenario."""
+        if scenario is not self._paths_scenario:
+            self._paths_scenario = scenario
+            self._paths_by_obj = {}
+        paths = self._paths_by_obj.get(obj)
+        if paths is None:
+            paths = self._paths_by_obj[obj] = self._enumerate_paths(scenario, obj)
+        return paths
+
+    def _enumerate_paths(self, scenario: Scenario, obj: str) -> List[List[tuple]]:
         graph = nx.DiGraph()
         for transfer in scenario.transfers:
             if transfer.object_type != obj:
@@ -186,13 +228,7 @@ class MultiHopQuestionGenerator:
 
     def _wrap(self, qtype: str, text: str, answer: int | str, hops: int = 2) -> GeneratedQuestion:
         multiplier = self.cfg.complexity_multipliers.get(
-            {
-                "multi_hop_indirect": "intermediate_state",
-                "multi_hop_net_flow": "path_sum",
-                "multi_hop_path_count": "net_change_chain",
-                "multi_hop_multi_step": "agent_final_after_chain",
-            }.get(qtype, "intermediate_state"),
-            1.0,
+            self.MULTIPLIER_KEYS.get(qtype, "intermediate_state"), 1.0
         )
         return GeneratedQuestion(
             question_type=qtype,
@@ -45,6 +45,7 @@ class DatasetConfig:
     balanced_generation: bool = False
     questions_filename: str = "questions.json"
     scenarios_filename: str = "scenarios.json"
+    workers: int = 1
 
     @property
     def output_dir(self) -> str:
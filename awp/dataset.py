@@ -4,10 +4,10 @@ from __future__ import annotations
 
 import json
 from collections import Counter
-from dataclasses import asdict
 from pathlib import Path
-from typing import Dict, Iterable, List
+from typing import Dict, Iterable, List, TextIO
 
+from .analysis import analyze_distribution
 from .scenario import Scenario
 
 
@@ -21,16 +21,29 @@ class DatasetManager:
     def save_questions(self, questions: List[dict], filename: str) -> Path:
         path = self.root / filename
         with path.open("w", encoding="utf-8") as handle:
-            json.dump(questions, handle, indent=2, ensure_ascii=False)
+            self._write_json_array(handle, questions)
         return path
 
     def save_scenarios(self, scenarios: Iterable[Scenario], filename: str) -> Path:
         path = self.root / filename
-        payload = [asdict(s) for s in scenarios]
         with path.open("w", encoding="utf-8") as handle:
-            json.dump(payload, handle, indent=2, ensure_ascii=False)
+            self._write_json_array(handle, (s.to_dict() for s in scenarios))
         return path
 
+    @staticmethod
+    def _write_json_array(handle: TextIO, items: Iterable[object]) -> None:
+        """Write ``items`` as an indented JSON array one element at a time.
+
+        Output matches ``json.dump(list(items), handle, indent=2)`` without
+        holding the whole payload in memory.
+        """
+        separator = "[\n  "
+        for item in items:
+            handle.write(separator)
+            handle.write(json.dumps(item, indent=2, ensure_ascii=False).replace("\n", "\n  "))
+            separator = ",\n  "
+        handle.write("[]" if separator == "[\n  " else "\n]")
+
     def load_questions(self, path: str | Path) -> List[dict]:
         with Path(path).open("r", encoding="utf-8") as handle:
             return json.load(handle)
@@ -38,16 +51,7 @@ class DatasetManager:
     # ------------------------------------------------------------------
     @staticmethod
     def summarize(questions: List[dict]) -> Dict[str, Dict[str, int]]:
-        question_types = Counter(q["question_type"] for q in questions)
-        masking = Counter(q.get("masking_applied", "none") for q in questions)
-        agents = Counter(q["target_agent"] for q in questions)
-        objects = Counter(q["target_object"] for q in questions)
-        return {
-            "question_types": dict(question_types),
-            "masking": dict(masking),
-            "agents": dict(agents),
-            "objects": dict(objects),
-        }
+        return analyze_distribution(questions)
 
     @staticmethod
     def scenario_summary(scenarios: Iterable[Scenario]) -> Dict[str, float]:
@@ -75,3 +79,25 @@ class DatasetManager:
             if q.get("masking_applied") not in (None, "none") and not q.get("masked_note"):
                 issues["missing_mask_note"].append(qid)
         return issues
+
+    @staticmethod
+    def validate_scenarios(scenarios: Iterable[Scenario]) -> Dict[str, List[int]]:
+        """Check per-scenario invariants without replaying the transfers.
+
+        Transfers only move objects between agents, so each object's total is
+        conserved and no final holding can go negative.
+        """
+        issues = {"unbalanced_objects": [], "negative_inventory": []}
+        for scenario in scenarios:
+            initial: Counter = Counter()
+            final: Counter = Counter()
+            negative = False
+            for agent in scenario.agents:
+                initial.update(agent.initial_inventory)
+                final.update(agent.final_inventory)
+                negative = negative or min(agent.final_inventory.values(), default=0) < 0
+            if initial != final:
+                issues["unbalanced_objects"].append(scenario.scenario_id)
+            if negative:
+                issues["negative_inventory"].append(scenario.scenario_id)
+        return issues
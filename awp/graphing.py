@@ -39,11 +39,13 @@ class GraphBuilder:
         g = nx.DiGraph()
         g.add_nodes_from(agents)
         parents = agents[:1]
-        for agent in agents[1:]:
-            parent = self.rng.choice(parents)
-            g.add_edge(parent, agent)
+        choice, add_edge = self.rng.choice, g.add_edge
+        # Every new agent adds exactly one edge, so the count is the position.
+        for added, agent in enumerate(agents[1:], 1):
+            parent = choice(parents)
+            add_edge(parent, agent)
             parents.append(agent)
-            if g.number_of_edges() >= max_edges:
+            if added >= max_edges:
                 break
         return g
 
@@ -51,54 +53,60 @@ class GraphBuilder:
         g = nx.DiGraph()
         nodes = agents[:]
         self.rng.shuffle(nodes)
-        for idx, agent in enumerate(nodes):
-            g.add_edge(agent, nodes[(idx + 1) % len(nodes)])
-            if g.number_of_edges() >= max_edges:
-                return g
+        count = len(nodes)
+        g.add_edges_from((nodes[idx], nodes[(idx + 1) % count]) for idx in range(min(count, max_edges)))
         return g
 
     def _build_star(self, agents: List[str], max_edges: int) -> nx.DiGraph:
         g = nx.DiGraph()
         hub = self.rng.choice(agents)
-        for agent in agents:
-            if agent == hub:
-                continue
-            g.add_edge(hub, agent)
-            if g.number_of_edges() >= max_edges:
-                break
+        spokes = [(hub, agent) for agent in agents if agent != hub]
+        g.add_edges_from(spokes[:max_edges])
         return g
 
     def _build_flow_network(self, agents: List[str], max_edges: int) -> nx.DiGraph:
         g = nx.DiGraph()
         g.add_nodes_from(agents)
+        # Insertion-ordered edge set: the rejection loop never touches the graph.
+        edges: Dict[Tuple[str, str], None] = {}
         attempts = 0
-        limit = max_edges * self.config.parameters.chain_branching_factor
-        while g.number_of_edges() < max_edges and attempts < max(limit, 1):
-            a, b = self.rng.sample(agents, 2)
-            if g.has_edge(a, b):
+        limit = max(max_edges * self.config.parameters.chain_branching_factor, 1)
+        sample = self.rng.sample
+        while len(edges) < max_edges and attempts < limit:
+            edge = tuple(sample(agents, 2))
+            if edge in edges:
                 attempts += 1
                 continue
-            g.add_edge(a, b)
+            edges[edge] = None
+        g.add_edges_from(edges)
         return g
 
     def _build_dag(self, agents: List[str], max_edges: int) -> nx.DiGraph:
         g = nx.DiGraph()
         ordering = agents[:]
         self.rng.shuffle(ordering)
+        draw, add_edge = self.rng.random, g.add_edge
+        added = 0
         for idx, source in enumerate(ordering):
             for target in ordering[idx + 1 :]:
-                if g.number_of_edges() >= max_edges:
+                if added >= max_edges:
                     return g
-                if self.rng.random() < 0.6:
-                    g.add_edge(source, target)
+                if draw() < 0.6:
+                    add_edge(source, target)
+                    added += 1
         return g
 
     def _build_complete(self, agents: List[str], max_edges: int) -> nx.DiGraph:
         g = nx.DiGraph()
-        edges = [(a, b) for a in agents for b in agents if a != b]
-        self.rng.shuffle(edges)
-        for a, b in edges[:max_edges]:
-            g.add_edge(a, b)
+        # Sample positions in the row-major list of ordered pairs rather than
+        # materialising all n * (n - 1) of them; the draws are identical.
+        span = len(agents) - 1
+        total = len(agents) * span
+        edges = []
+        for idx in self.rng.sample(range(total), min(max_edges, total)):
+            row, col = divmod(idx, span)
+            edges.append((agents[row], agents[col + (col >= row)]))
+        g.add_edges_from(edges)
         return g
 
     def _build_bipartite(self, agents: List[str], max_edges: int) -> nx.DiGraph:
@@ -112,32 +120,47 @@ class GraphBuilder:
         for a in group_a:
             for b in group_b:
                 edges.extend([(a, b), (b, a)])
-        self.rng.shuffle(edges)
-        for a, b in edges[:max_edges]:
-            g.add_edge(a, b)
+        g.add_edges_from(self.rng.sample(edges, min(max_edges, len(edges))))
         return g
 
 
+# Below this many nodes the exact all-pairs diameter is cheap enough.
+EXACT_DIAMETER_MAX_NODES = 64
+
+
+def _two_sweep_diameter(graph: nx.Graph) -> int:
+    """Lower bound on the diameter from two BFS sweeps (exact on trees)."""
+    start = next(iter(graph))
+    lengths = nx.single_source_shortest_path_length(graph, start)
+    far = max(lengths, key=lengths.__getitem__)
+    return max(nx.single_source_shortest_path_length(graph, far).values())
+
+
 def graph_metrics(graph: nx.DiGraph) -> Dict[str, float]:
     """Compute lightweight metrics used for complexity calculations."""
 
     if graph.number_of_nodes() == 0:
         return {"density": 0.0, "diameter": 0.0, "avg_branching": 0.0, "cycle_count": 0.0}
 
+    # number_of_edges() walks the adjacency, so read it once. Out-degrees sum
+    # to the edge count, so the branching mean needs no per-node pass either.
+    nodes = graph.number_of_nodes()
+    edges = graph.number_of_edges()
     metrics = {
-        "density": nx.density(graph),
-        "avg_branching": sum(graph.out_degree(n) for n in graph.nodes())
-        / max(1, graph.number_of_nodes()),
+        "density": edges / (nodes * (nodes - 1)) if nodes > 1 else 0,
+        "avg_branching": edges / nodes,
     }
 
     undirected = graph.to_undirected()
-    try:
-        metrics["diameter"] = nx.diameter(undirected)
-    except nx.NetworkXError:
+    if not nx.is_connected(undirected):
         metrics["diameter"] = 0.0
+    elif nodes < EXACT_DIAMETER_MAX_NODES:
+        metrics["diameter"] = nx.diameter(undirected)
+    else:
+        metrics["diameter"] = _two_sweep_diameter(undirected)
 
     metrics["cycle_count"] = float(
-        len(list(nx.simple_cycles(graph))) if graph.number_of_edges() < 200 else 0
+        sum(1 for _ in nx.simple_cycles(graph)) if edges < 200 else 0
     )
     return metrics
 
@@ -4,10 +4,43 @@ from __future__ import annotations
 
 import random
 import re
-from typing import Dict, List
+from collections import defaultdict
+from dataclasses import dataclass
+from itertools import accumulate
+from typing import Dict, List, Optional, Pattern, Tuple
 
-from .scenario import Scenario
-from .text import TextProcessor
+from .scenario import Agent, Scenario
+from .text import TextProcessor, compose_question, pluralize, vague_quantity
+
+
+_VERBS = "|".join(re.escape(verb) for verb in TextProcessor.TRANSFER_VERBS)
+_TRANSFER_VERB_RE = re.compile(rf"\b(?:{_VERBS})\b")
+_TRANSFER_RE = re.compile(
+    rf"(?P<sender>\w+)\s+(?P<verb>{_VERBS})\s+(?P<count>\d+)\s+(?P<object>\w+)\s+to\s+(?P<receiver>\w+)",
+    re.IGNORECASE,
+)
+
+_HAS = "{} has {} {}.".format
+_SAME_AS = "{} has the same number of {} as {}.".format
+_MORE_THAN = "{} has {} more {} than {}.".format
+_FEWER_THAN = "{} has {} fewer {} than {}.".format
+_NOW_HAS = "In total, {} now has {} {}.".format
+
+
+@dataclass(slots=True)
+class _ScenarioIndex:
+    """Lookups shared by every masking pattern applied to one scenario."""
+
+    holders: Dict[str, List[Agent]]
+
+    @classmethod
+    def build(cls, scenario: Scenario) -> "_ScenarioIndex":
+        holders: Dict[str, List[Agent]] = {}
+        for agent in scenario.agents:
+            for obj, count in agent.initial_inventory.items():
+                if count > 0:
+                    holders.setdefault(obj, []).append(agent)
+        return cls(holders=holders)
 
 
 class MaskingEngine:
@@ -27,7 +60,17 @@ class MaskingEngine:
         self.scramble_probability = scramble_probability
         self.pattern_weights = pattern_weights
         self.rng = random.Random(seed)
-        self.text = TextProcessor(seed=seed)
+        self._patterns = (
+            ("mask_initial_count", self._mask_initial_count),
+            ("comparative_inference_chains", self._comparative_chain),
+            ("percentage_ratio_masking", self._percentage_ratio),
+        )
+        self._pattern_cum_weights = list(
+            accumulate(pattern_weights.get(name, 1.0) for name, _ in self._patterns)
+        )
+        self._indexed_scenario: Optional[Scenario] = None
+        self._index: Optional[_ScenarioIndex] = None
+        self._quantity_patterns: Dict[str, Pattern[str]] = {}
 
     # ------------------------------------------------------------------
     def scramble(self, sentences: List[str]) -> List[str]:
@@ -40,7 +83,7 @@ class MaskingEngine:
         transfer_sentences: List[str] = []
 
         for sentence in sentences:
-            if any(verb in sentence for verb in self.text.TRANSFER_VERBS):
+            if _TRANSFER_VERB_RE.search(sentence):
                 transfer_sentences.append(sentence)
             else:
                 initial_sentences.append(sentence)
@@ -61,13 +104,9 @@ class MaskingEngine:
             question["masking_applied"] = "none"
             return question
 
-        patterns = [
-            ("mask_initial_count", self._mask_initial_count),
-            ("comparative_inference_chains", self._comparative_chain),
-            ("percentage_ratio_masking", self._percentage_ratio),
-        ]
-        weights = [self.pattern_weights.get(name, 1.0) for name, _ in patterns]
-        pattern_name, handler = self.rng.choices(patterns, weights=weights, k=1)[0]
+        pattern_name, handler = self.rng.choices(
+            self._patterns, cum_weights=self._pattern_cum_weights, k=1
+        )[0]
 
         updated = handler(question, scenario)
         if updated:
@@ -78,36 +117,40 @@ class MaskingEngine:
             question["masking_applied"] = "none"
         return question
 
+    def _index_for(self, scenario: Scenario) -> _ScenarioIndex:
+        if scenario is not self._indexed_scenario or self._index is None:
+            self._index = _ScenarioIndex.build(scenario)
+            self._indexed_scenario = scenario
+        return self._index
+
     # ------------------------------------------------------------------
     def _mask_initial_count(self, question: Dict, scenario: Scenario) -> List[str] | None:
         target = question.get("target_agent")
         obj = question.get("target_object")
-        sentences = [s for s in question["context_sentences"]]
+        if not (target and obj):
+            return None
+        sentences = list(question["context_sentences"])
         changed = False
-        final_count = None
-        plural = obj
-        for agent in scenario.agents:
-            if agent.name == target:
-                final_count = agent.final_inventory.get(obj, 0)
-                plural = self.text.pluralize(obj, final_count)
-                break
-
+        quantity_pattern = self._quantity_patterns.get(obj)
+        if quantity_pattern is None:
+            quantity_pattern = self._quantity_patterns[obj] = re.compile(r"(\d+)\s+" + re.escape(obj))
         for idx, sentence in enumerate(sentences):
-            if not (target and obj and target in sentence and obj in sentence):
+            if target not in sentence or obj not in sentence:
                 continue
-            numbers = re.findall(r"\d+", sentence)
-            if not numbers:
+            match = quantity_pattern.search(sentence)
+            if not match:
                 continue
-            count = int(numbers[0])
-            vague = self.text.vague_quantity(count)
-            new_sentence = re.sub(r"\d+\s+" + re.escape(obj), f"{vague} {obj}", sentence, count=1)
-            if new_sentence != sentence:
-                sentences[idx] = new_sentence
-                changed = True
-                break
+            vague = vague_quantity(int(match.group(1)))
+            start, end = match.span()
+            sentences[idx] = f"{sentence[:start]}{vague} {obj}{sentence[end:]}"
+            changed = True
+            break
         if changed:
-            if final_count is not None:
-                sentences.append(f"In total, {target} now has {final_count} {plural}.")
+            agent = scenario.agents_by_name.get(target)
+            if agent is not None:
+                final_count = agent.final_inventory.get(obj, 0)
+                plural = pluralize(obj, final_count)
+                sentences.append(_NOW_HAS(target, final_count or "no", plural))
             question["masking_applied"] = "mask_initial_count"
             question["masked_note"] = "Initial quantity hidden with vague phrasing."
             return sentences
@@ -115,67 +158,60 @@ class MaskingEngine:
 
     def _comparative_chain(self, question: Dict, scenario: Scenario) -> List[str] | None:
         obj = question.get("target_object")
-        candidates = [a for a in scenario.agents if a.initial_inventory.get(obj, 0) > 0]
+        candidates = self._index_for(scenario).holders.get(obj, [])
         if len(candidates) < 3:
             return None
         selected = self.rng.sample(candidates, 3)
         anchor = self.rng.choice(selected)
-        context = [s for s in question["context_sentences"]]
+        anchor_count = anchor.initial_inventory[obj]
+        context = list(question["context_sentences"])
 
+        anchor_name = anchor.name
         comparison_sentences: List[str] = []
         for agent in selected:
-            if agent.name == anchor.name:
-                proper_obj = self.text.pluralize(obj, anchor.initial_inventory.get(obj, 0))
+            if agent is anchor:
                 comparison_sentences.append(
-                    f"{anchor.name} has {anchor.initial_inventory.get(obj, 0)} {proper_obj}."
+                    _HAS(anchor_name, anchor_count, pluralize(obj, anchor_count))
                 )
                 continue
-            count = agent.initial_inventory.get(obj, 0)
-            anchor_count = anchor.initial_inventory.get(obj, 0)
+            count = agent.initial_inventory[obj]
             if count == anchor_count:
-                comparison_sentences.append(
-                    f"{agent.name} has the same number of {obj} as {anchor.name}."
-                )
+                comparison_sentences.append(_SAME_AS(agent.name, obj, anchor_name))
             elif count > anchor_count:
-                diff = count - anchor_count
-                comparison_sentences.append(
-                    f"{agent.name} has {diff} more {obj} than {anchor.name}."
-                )
+                comparison_sentences.append(_MORE_THAN(agent.name, count - anchor_count, obj, anchor_name))
             else:
-                diff = anchor_count - count
-                comparison_sentences.append(
-                    f"{agent.name} has {diff} fewer {obj} than {anchor.name}."
-                )
+                comparison_sentences.append(_FEWER_THAN(agent.name, anchor_count - count, obj, anchor_name))
 
-        replaced = False
+        names = [agent.name for agent in selected]
         for idx, sentence in enumerate(context):
-            if any(agent.name in sentence and obj in sentence for agent in selected):
-                context = context[:idx] + comparison_sentences + context[idx + 1 :]
-                replaced = True
-                break
-        if replaced:
-            question["masking_applied"] = "comparative_inference_chains"
-            question["masked_note"] = "Must reason through comparative chain."
-            return context
+            if obj in sentence and any(name in sentence for name in names):
+                # context is already a private copy; splice in place.
+                context[idx : idx + 1] = comparison_sentences
+                question["masking_applied"] = "comparative_inference_chains"
+                question["masked_note"] = "Must reason through comparative chain."
+                return context
         return None
 
     def _percentage_ratio(self, question: Dict, scenario: Scenario) -> List[str] | None:
-        sentences = [s for s in question["context_sentences"]]
-        inventory = {agent.name: agent.initial_inventory.copy() for agent in scenario.agents}
+        sentences = list(question["context_sentences"])
+        by_name = scenario.agents_by_name
+        deltas: Dict[Tuple[str, str], int] = defaultdict(int)
         changed = False
-        pattern = re.compile(
-            r"(?P<sender>\w+)\s+(?P<verb>gives|transfers|shares|hands over)\s+(?P<count>\d+)\s+(?P<object>\w+)\s+to\s+(?P<receiver>\w+)",
-            re.IGNORECASE,
-        )
         for idx, sentence in enumerate(sentences):
-            match = pattern.search(sentence)
+            # Cheap literal check first: holdings sentences never contain " to ".
+            if " to " not in sentence:
+                continue
+            match = _TRANSFER_RE.search(sentence)
             if not match:
                 continue
             sender = match.group("sender")
             receiver = match.group("receiver")
             obj = match.group("object")
             count = int(match.group("count"))
-            sender_total = inventory.get(sender, {}).get(obj, 0)
+            holder = by_name.get(sender)
+            if holder is None:
+                continue
+            sender_total = holder.initial_inventory.get(obj, 0) + deltas[(sender, obj)]
             if sender_total <= 0 or sender_total < count:
                 continue
             percentage = (count / sender_total) * 100
@@ -183,8 +219,8 @@ class MaskingEngine:
             start, end = match.span()
             replacement = f"{sender} {match.group('verb')} {percent_text} of their {obj} to {receiver}"
             sentences[idx] = sentence[:start] + replacement + sentence[end:]
-            inventory[sender][obj] = sender_total - count
-            inventory[receiver][obj] = inventory.get(receiver, {}).get(obj, 0) + count
+            deltas[(sender, obj)] -= count
+            deltas[(receiver, obj)] += count
             changed = True
         if changed:
             question["masking_applied"] = "percentage_ratio_masking"
@@ -195,6 +231,6 @@ class MaskingEngine:
     # ------------------------------------------------------------------
     def _update_text(self, question: Dict) -> None:
         sentences = question.get("context_sentences", [])
-        question["question"] = self.text.join_sentences(sentences) + " " + question.get("question_text", "")
+        question["question"] = compose_question(sentences, question.get("question_text", ""))
 
 
@@ -3,8 +3,10 @@
 from __future__ import annotations
 
 import random
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
-from typing import Dict, List, Optional
+from string import Formatter
+from typing import Callable, Dict, FrozenSet, Iterator, List, Optional, Tuple
 
 from .advanced import (
     AdvancedQuestionGenerator,
@@ -13,110 +15,133 @@ from .advanced import (
 )
 from .config import Config
 from .masking import MaskingEngine
-from .scenario import Agent, Scenario, ScenarioFactory
-from .text import TextProcessor
+from .scenario import Agent, Scenario, ScenarioFactory, spawn_seeds
+from .text import TextProcessor, compose_question
+
+
+Renderer = Tuple[Callable[[Dict], str], FrozenSet[str]]
+
+
+def _compile_template(template: str) -> Renderer:
+    fields = frozenset(name for _, name, _, _ in Formatter().parse(template) if name)
+    return template.format_map, fields
 
 
 class TemplateManager:
     """Stores reusable question templates."""
 
     BASIC_TEMPLATES = {
-        "initial_count": [
+        "initial_count": (
             "How many {object} did {agent} start with?",
             "What was {agent}'s starting number of {object}?",
             "Initially, how many {object} belonged to {agent}?",
             "At the beginning, {agent} had how many {object}?",
             "Before any transfers, how many {object} were with {agent}?",
-        ],
-        "final_count": [
+        ),
+        "final_count": (
             "How many {object} does {agent} have now?",
             "How many {object} remain with {agent} at the end?",
             "After all trades, how many {object} is {agent} holding?",
             "Finally, what is {agent}'s count of {object}?",
             "When the story ends, how many {object} are with {agent}?",
-        ],
-        "difference": [
+        ),
+        "difference": (
             "By how many {object} did {agent}'s count change?",
             "What is the difference between {agent}'s final and initial {object}?",
             "How many more or fewer {object} does {agent} have now compared to the start?",
             "What is the net change in {agent}'s {object}?",
             "How many {object} did {agent} gain or lose overall?",
-        ],
-        "transfer_amount": [
+        ),
+        "transfer_amount": (
             "How many {object} moved between {agent} and {other_agent}?",
             "What quantity of {object} was traded between {agent} and {other_agent}?",
             "How many {object} did {agent} pass to {other_agent}?",
             "How many {object} did {agent} receive from {other_agent}?",
             "Count the {object} exchanged between {agent} and {other_agent}.",
-        ],
-        "total_transferred": [
+        ),
+        "total_transferred": (
             "How many {object} did {agent} give away?",
             "What is the total number of {object} that {agent} sent out?",
             "Altogether, how many {object} left {agent}'s inventory?",
             "How many {object} did {agent} hand over to others?",
             "What sum of {object} did {agent} transfer away?",
-        ],
-        "total_received": [
+        ),
+        "total_received": (
             "How many {object} did {agent} receive?",
             "What is the total number of {object} that {agent} got from others?",
             "Altogether, how many {object} came to {agent}?",
             "How many {object} were given to {agent}?",
             "What sum of {object} ended up being received by {agent}?",
-        ],
-        "sum_all": [
+        ),
+        "sum_all": (
             "How many {object} do all agents have together?",
             "What is the combined total of {object} across everyone?",
             "Add up every agent's {object}. What number do you get?",
             "How many {object} exist in total after the transfers?",
             "What is the grand total of {object} in the story?",
-        ],
+        ),
     }
 
     ADVANCED_TEMPLATES = {
-        "comparative_more": [
+        "comparative_more": (
             "Who has more {object}, {agent_a} or {agent_b}?",
             "Between {agent_a} and {agent_b}, who holds more {object}?",
             "Which agent has the greater number of {object}, {agent_a} or {agent_b}?",
             "Who ends with the larger {object} count, {agent_a} or {agent_b}?",
-        ],
-        "comparative_difference": [
+        ),
+        "comparative_difference": (
             "How many more {object} does {agent_a} have than {agent_b}?",
             "What is the gap between {agent_a}'s and {agent_b}'s {object}?",
             "By how much does {agent_a}'s {object} count exceed {agent_b}'s?",
             "How many fewer {object} does {agent_b} have compared to {agent_a}?",
-        ],
-        "temporal_after_step": [
+        ),
+        "temporal_after_step": (
             "How many {object} does {agent} have after step {step}?",
             "Right after the {step}th transfer, how many {object} belong to {agent}?",
             "Following step {step}, what is {agent}'s {object} count?",
-        ],
-        "conditional_if_gave_more": [
+        ),
+        "conditional_if_gave_more": (
             "If {agent} gave {extra} more {object} to {other}, how many would {other} have?",
             "Suppose {agent} handed {extra} extra {object} to {other}; what would {other}'s total be?",
             "Imagine {agent} shared {extra} additional {object} with {other}. How many would {other} then own?",
-        ],
-        "multi_agent_combined": [
+        ),
+        "multi_agent_combined": (
             "Together, how many {object} do {agents}?",
             "What is the combined {object} count for {agents}?",
             "Add up the {object} held by {agents}. What is the total?",
-        ],
-        "ratio_fraction": [
+        ),
+        "ratio_fraction": (
             "What fraction of all {object} does {agent} hold?",
             "Express {agent}'s share of the {object} as a fraction of the total.",
             "{agent} owns what fraction of the total {object}?",
-        ],
-        "ratio_percentage": [
+        ),
+        "ratio_percentage": (
             "What percentage of all {object} does {agent} have?",
             "Express {agent}'s {object} as a percentage of the total.",
             "{agent} holds what percent of all the {object}?",
-        ],
+        ),
     }
 
+    FALLBACK_TEMPLATE = "How many {object} does {agent} have?"
+
+    def __init__(self, rng: Optional[random.Random] = None) -> None:
+        self.rng = rng if rng is not None else random.Random()
+        # Bound format_map per template plus the fields it reads, so callers
+        # only compute the values a template actually uses.
+        self._renderers: Dict[str, Tuple[Renderer, ...]] = {
+            qtype: tuple(_compile_template(template) for template in templates)
+            for qtype, templates in {**self.ADVANCED_TEMPLATES, **self.BASIC_TEMPLATES}.items()
+        }
+        self._fallback = _compile_template(self.FALLBACK_TEMPLATE)
+
+    def choose(self, question_type: str) -> Renderer:
+        renderers = self._renderers.get(question_type)
+        if not renderers:
+            return self._fallback
+        return self.rng.choice(renderers)
+
     def render(self, question_type: str, **kwargs) -> str:
-        templates = self.BASIC_TEMPLATES.get(question_type) or self.ADVANCED_TEMPLATES.get(question_type)
-        if not templates:
-            return "How many {object} does {agent} have?".format(**kwargs)
-        return random.choice(templates).format(**kwargs)
+        return self.choose(question_type)[0](kwargs)
 
 
 class AnswerCalculator:
@@ -130,29 +155,16 @@ class AnswerCalculator:
         return agent.final_inventory.get(obj, 0) - agent.initial_inventory.get(obj, 0)
 
     def transfer_amount(self, scenario: Scenario, agent: Agent, obj: str) -> int:
-        for transfer in scenario.transfers:
-            if obj != transfer.object_type:
-                continue
-            if transfer.from_agent == agent.name or transfer.to_agent == agent.name:
-                return transfer.quantity
-        return 0
+        return scenario.aggregates.first_transfer.get((agent.name, obj), 0)
 
     def total_transferred(self, scenario: Scenario, agent: Agent, obj: str) -> int:
-        return sum(
-            t.quantity
-            for t in scenario.transfers
-            if t.from_agent == agent.name and t.object_type == obj
-        )
+        return scenario.aggregates.given.get((agent.name, obj), 0)
 
     def total_received(self, scenario: Scenario, agent: Agent, obj: str) -> int:
-        return sum(
-            t.quantity
-            for t in scenario.transfers
-            if t.to_agent == agent.name and t.object_type == obj
-        )
+        return scenario.aggregates.received.get((agent.name, obj), 0)
 
     def sum_all(self, scenario: Scenario, obj: str) -> int:
-        return sum(agent.final_inventory.get(obj, 0) for agent in scenario.agents)
+        return scenario.aggregates.final_total_by_obj.get(obj, 0)
 
 
 @dataclass
@@ -174,9 +186,11 @@ class QuestionRecord:
 class QuestionGenerator:
     def __init__(self, config: Config, seed: int | None = None) -> None:
         self.config = config
-        self.rng = random.Random(seed or config.meta.seed)
-        self.templates = TemplateManager()
-        self.text = TextProcessor(seed=seed or config.meta.seed)
+        # ``is None`` rather than ``or``: 0 is a valid seed, not "use the default".
+        seed = config.meta.seed if seed is None else seed
+        self.rng = random.Random(seed)
+        self.templates = TemplateManager(random.Random(seed))
+        self.text = TextProcessor(seed=seed)
         self.calculator = AnswerCalculator()
         self.masking = MaskingEngine(
             enable_masking=config.question.enable_masking,
@@ -184,12 +198,22 @@ class QuestionGenerator:
             masking_probability=config.question.masking_probability,
             scramble_probability=config.question.scramble_probability,
             pattern_weights=config.masking.pattern_probabilities,
-            seed=seed or config.meta.seed,
+            seed=seed,
         )
-        self.scenario_factory = ScenarioFactory(config, seed=seed or config.meta.seed)
+        self.scenario_factory = ScenarioFactory(config, seed=seed)
         self.advanced = AdvancedQuestionGenerator(config, self.rng)
         self.multi_hop = MultiHopQuestionGenerator(config, self.rng)
         self.question_counter = 0
+        calc = self.calculator
+        self._answer_dispatch = {
+            "initial_count": lambda scenario, agent, obj: calc.initial_count(agent, obj),
+            "final_count": lambda scenario, agent, obj: calc.final_count(agent, obj),
+            "difference": lambda scenario, agent, obj: calc.difference(agent, obj),
+            "transfer_amount": calc.transfer_amount,
+            "total_transferred": calc.total_transferred,
+            "total_received": calc.total_received,
+            "sum_all": lambda scenario, agent, obj: calc.sum_all(scenario, obj),
+        }
 
     # ------------------------------------------------------------------
     def generate_dataset(
@@ -198,25 +222,57 @@ class QuestionGenerator:
         scenarios = self.scenario_factory.generate(self.config.dataset.num_scenarios)
         all_questions: List[dict] = []
 
-        for idx, scenario in enumerate(scenarios, 1):
-            all_questions.extend(self._questions_for_scenario(scenario))
+        # Every scenario's questions come from their own spawned seed, so the
+        # dataset is the same whatever the worker count.
+        seeds = spawn_seeds(self.rng, len(scenarios))
+        if self.config.dataset.workers > 1:
+            batches = self._questions_in_parallel(seeds, scenarios, self.config.dataset.workers)
+        else:
+            # A separate instance keeps self.rng on the master stream, as in the pool.
+            worker = QuestionGenerator(self.config)
+            batches = map(worker._seeded_questions, seeds, scenarios)
+        for idx, questions in enumerate(batches, 1):
+            for record in questions:
+                self.question_counter += 1
+                record["question_id"] = self.question_counter
+            all_questions.extend(questions)
             if progress_callback:
                 progress_callback(idx, len(scenarios), len(all_questions))
 
         return {"questions": all_questions, "scenarios": scenarios}
 
+    def reseed(self, seed: int) -> None:
+        """Restart every RNG from ``seed``, as if freshly constructed with it."""
+        for rng in (self.rng, self.templates.rng, self.text.rng, self.masking.rng):
+            rng.seed(seed)
+
+    def _seeded_questions(self, seed: int, scenario: Scenario) -> List[dict]:
+        self.reseed(seed)
+        return self._questions_for_scenario(scenario)
+
     def _questions_for_scenario(self, scenario: Scenario) -> List[dict]:
-        questions: List[dict] = []
-        for _ in range(self.config.dataset.questions_per_scenario):
-            record = self._build_question(scenario)
-            questions.append(record)
-        return questions
+        count = self.config.dataset.questions_per_scenario
+        agents = self.rng.choices(scenario.agents, k=count)
+        objects = self.rng.choices(scenario.object_types, k=count)
+        return [self._build_question(scenario, agent, obj) for agent, obj in zip(agents, objects)]
+
+    def _questions_in_parallel(
+        self, seeds: List[int], scenarios: List[Scenario], workers: int
+    ) -> Iterator[List[dict]]:
+        """Generate per-scenario batches in worker processes, in scenario order.
+
+        Each batch is built from its scenario's seed exactly as the serial
+        path builds it, so the output matches a ``workers=1`` run.
+        """
+        chunksize = max(1, len(scenarios) // (workers * 4))
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_questions_worker, initargs=(self.config,)
+        ) as pool:
+            yield from pool.map(_questions_worker, seeds, scenarios, chunksize=chunksize)
 
     # ------------------------------------------------------------------
-    def _build_question(self, scenario: Scenario) -> Dict:
+    def _build_question(self, scenario: Scenario, agent: Agent, obj: str) -> Dict:
         qtype = self._select_question_type()
-        agent = self.rng.choice(scenario.agents)
-        obj = self.rng.choice(scenario.object_types)
 
         if qtype in self.config.question.question_types:
             record = self._build_basic_question(scenario, agent, obj, qtype)
@@ -310,13 +366,13 @@ class QuestionGenerator:
     ) -> Dict:
         story_sentences = self.text.build_story(scenario)
         story_sentences = self.masking.scramble(story_sentences)
-        full_text = self.text.join_sentences(story_sentences) + " " + question_text
 
         self.question_counter += 1
         record = {
             "question_id": self.question_counter,
             "scenario_id": scenario.scenario_id,
-            "question": full_text,
+            # Filled in after masking, which rewrites it when it changes the context.
+            "question": "",
             "question_text": question_text,
             "question_type": qtype,
             "target_agent": agent.name,
@@ -328,6 +384,8 @@ class QuestionGenerator:
         }
 
         record = self.masking.apply(record, scenario)
+        if not record["question"]:
+            record["question"] = compose_question(record["context_sentences"], question_text)
         scenario_complexity = scenario.complexity or 1.0
         weighted = (
             scenario_complexity
@@ -342,44 +400,42 @@ class QuestionGenerator:
     def _render_question(
         self, question_type: str, scenario: Scenario, agent: Agent, obj: str
     ) -> str:
-        kwargs = {
-            "agent": agent.name,
-            "agent_a": agent.name,
-            "agent_b": self._another_agent_name(scenario, agent),
-            "object": obj,
-            "other_agent": self._another_agent_name(scenario, agent),
-            "agents": ", ".join(a.name for a in scenario.agents[:3]),
-            "step": self.rng.randint(1, max(1, len(scenario.transfers))),
-            "extra": self.rng.randint(1, 5),
-            "other": self._another_agent_name(scenario, agent),
-        }
-        return self.templates.render(question_type, **kwargs)
+        render, fields = self.templates.choose(question_type)
+        kwargs = {"agent": agent.name, "agent_a": agent.name, "object": obj}
+        # Random fields are drawn only when the chosen template reads them.
+        if "agent_b" in fields:
+            kwargs["agent_b"] = self._another_agent_name(scenario, agent)
+        if "other_agent" in fields:
+            kwargs["other_agent"] = self._another_agent_name(scenario, agent)
+        if "agents" in fields:
+            kwargs["agents"] = ", ".join(a.name for a in scenario.agents[:3])
+        if "step" in fields:
+            kwargs["step"] = self.rng.randint(1, max(1, len(scenario.transfers)))
+        if "extra" in fields:
+            kwargs["extra"] = self.rng.randint(1, 5)
+        if "other" in fields:
+            kwargs["other"] = self._another_agent_name(scenario, agent)
+        return render(kwargs)
 
     def _another_agent_name(self, scenario: Scenario, agent: Agent) -> str:
         others = [a.name for a in scenario.agents if a.name != agent.name]
         return self.rng.choice(others) if others else agent.name
 
     def _compute_answer(self, question_type: str, scenario: Scenario, agent: Agent, obj: str):
-        calc = self.calculator
-        dispatch = {
-            "initial_count": lambda: calc.initial_count(agent, obj),
-            "final_count": lambda: calc.final_count(agent, obj),
-            "difference": lambda: calc.difference(agent, obj),
-            "transfer_amount": lambda: calc.transfer_amount(scenario, agent, obj),
-            "total_transferred": lambda: calc.total_transferred(scenario, agent, obj),
-            "total_received": lambda: calc.total_received(scenario, agent, obj),
-            "sum_all": lambda: calc.sum_all(scenario, obj),
-        }
-        handler = dispatch.get(question_type)
+        handler = self._answer_dispatch.get(question_type)
         if handler:
-            return handler()
+            return handler(scenario, agent, obj)
         return 0
 
 
+# One generator per worker process; building it compiles every template.
+_worker_generator: Optional[QuestionGenerator] = None
 
 
+def _init_questions_worker(config: Config) -> None:
+    global _worker_generator
+    _worker_generator = QuestionGenerator(config)
 
 
-
-
-
+def _questions_worker(seed: int, scenario: Scenario) -> List[dict]:
+    return _worker_generator._seeded_questions(seed, scenario)
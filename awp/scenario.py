@@ -4,16 +4,21 @@ from __future__ import annotations
 
 import itertools
 import random
+import sys
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
-from typing import Dict, Iterable, List, Optional
+from functools import cached_property
+from typing import Dict, Iterable, List, Optional, Tuple
 
 import networkx as nx
+import numpy as np
 
 from .config import Config, DifficultyTemplate
 from .graphing import GraphBuilder, graph_metrics
 
 
-@dataclass
+@dataclass(slots=True)
 class Transfer:
     from_agent: str
     to_agent: str
@@ -21,13 +26,29 @@ class Transfer:
     quantity: int
     step: int
 
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "from_agent": self.from_agent,
+            "to_agent": self.to_agent,
+            "object_type": self.object_type,
+            "quantity": self.quantity,
+            "step": self.step,
+        }
+
 
-@dataclass
+@dataclass(slots=True)
 class Agent:
     name: str
     initial_inventory: Dict[str, int]
     final_inventory: Dict[str, int]
 
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "name": self.name,
+            "initial_inventory": self.initial_inventory,
+            "final_inventory": self.final_inventory,
+        }
+
 
 @dataclass
 class Scenario:
@@ -41,8 +62,69 @@ class Scenario:
     complexity: float = 0.0
     metadata: Dict[str, float] = field(default_factory=dict)
 
+    def to_dict(self) -> Dict[str, object]:
+        """Field-for-field equivalent of ``asdict`` for serialization.
+
+        Unlike ``asdict`` it does not deep-copy, so the result shares the
+        inventory and metric dicts with this scenario.
+        """
+        return {
+            "scenario_id": self.scenario_id,
+            "difficulty": self.difficulty,
+            "agents": [agent.to_dict() for agent in self.agents],
+            "transfers": [transfer.to_dict() for transfer in self.transfers],
+            "object_types": self.object_types,
+            "graph_type": self.graph_type,
+            "metrics": self.metrics,
+            "complexity": self.complexity,
+            "metadata": self.metadata,
+        }
 
-DEFAULT_AGENT_POOL = [
+    @cached_property
+    def agents_by_name(self) -> Dict[str, Agent]:
+        return {agent.name: agent for agent in self.agents}
+
+    @cached_property
+    def aggregates(self) -> "ScenarioAggregates":
+        """Transfer totals, built once on first use and kept with the scenario."""
+        return ScenarioAggregates.from_scenario(self)
+
+
+@dataclass(slots=True)
+class ScenarioAggregates:
+    """Transfer and inventory totals shared by every question on a scenario."""
+
+    given: Dict[Tuple[str, str], int]
+    received: Dict[Tuple[str, str], int]
+    final_total_by_obj: Dict[str, int]
+    # Quantity of the earliest transfer each (agent, object) took part in.
+    first_transfer: Dict[Tuple[str, str], int]
+
+    @classmethod
+    def from_scenario(cls, scenario: Scenario) -> "ScenarioAggregates":
+        given: Dict[Tuple[str, str], int] = defaultdict(int)
+        received: Dict[Tuple[str, str], int] = defaultdict(int)
+        first_transfer: Dict[Tuple[str, str], int] = {}
+        for transfer in scenario.transfers:
+            sender = (transfer.from_agent, transfer.object_type)
+            receiver = (transfer.to_agent, transfer.object_type)
+            given[sender] += transfer.quantity
+            received[receiver] += transfer.quantity
+            first_transfer.setdefault(sender, transfer.quantity)
+            first_transfer.setdefault(receiver, transfer.quantity)
+
+        final_total_by_obj: Dict[str, int] = defaultdict(int)
+        for agent in scenario.agents:
+            for obj, count in agent.final_inventory.items():
+                final_total_by_obj[obj] += count
+        return cls(dict(given), dict(received), dict(final_total_by_obj), first_transfer)
+
+
+# Below this many agent x object cells the scalar random.Random draws beat
+# NumPy's per-call setup cost.
+VECTORIZED_INVENTORY_MIN_CELLS = 64
+
+DEFAULT_AGENT_POOL = (
     "Alex",
     "Sam",
     "Taylor",
@@ -68,7 +150,7 @@ DEFAULT_AGENT_POOL = [
     "Emery",
     "Logan",
     "Micah",
-]
+)
 
 DEFAULT_OBJECTS = {
     "educational": ["books", "pencils", "notebooks", "erasers", "rulers", "markers"],
@@ -90,15 +172,39 @@ class ScenarioGenerator:
         self.graph_builder = GraphBuilder(config.graph, self.rng)
         self.agent_pool = DEFAULT_AGENT_POOL
         self.object_catalog = self._build_object_catalog()
+        self.object_pool = self._build_object_pool()
 
     # ------------------------------------------------------------------
     def generate(self, num_scenarios: Optional[int] = None) -> List[Scenario]:
         total = num_scenarios or self.config.dataset.num_scenarios
         difficulties = self._difficulty_sequence(total)
-        scenarios = []
-        for idx, difficulty in enumerate(difficulties, 1):
-            scenarios.append(self._build_scenario(idx, difficulty))
-        return scenarios
+        # Every scenario is built from its own spawned seed, so the output is
+        # the same whatever the worker count.
+        seeds = spawn_seeds(self.rng, total)
+        ids = range(1, total + 1)
+        if self.config.dataset.workers > 1:
+            return self._generate_in_parallel(seeds, ids, difficulties, self.config.dataset.workers)
+        # A separate instance keeps self.rng on the master stream, as in the pool.
+        builder = ScenarioGenerator(self.config)
+        return list(map(builder._seeded_scenario, seeds, ids, difficulties))
+
+    def _generate_in_parallel(
+        self, seeds: List[int], ids: Iterable[int], difficulties: List[str], workers: int
+    ) -> List[Scenario]:
+        """Build scenarios in worker processes, in scenario order.
+
+        Each scenario is built from its seed exactly as the serial path
+        builds it, so the output matches a ``workers=1`` run.
+        """
+        chunksize = max(1, len(difficulties) // (workers * 4))
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_scenario_worker, initargs=(self.config,)
+        ) as pool:
+            return list(pool.map(_scenario_worker, seeds, ids, difficulties, chunksize=chunksize))
+
+    def _seeded_scenario(self, seed: int, scenario_id: int, difficulty: str) -> Scenario:
+        self.rng.seed(seed)
+        return self._build_scenario(scenario_id, difficulty)
 
     def build_many(self, count: int) -> List[Scenario]:
         """Back-compat shim for older callers."""
@@ -114,6 +220,9 @@ class ScenarioGenerator:
         agent_names = self._sample_agents(num_agents)
         object_types = self._sample_objects(num_objects)
         inventories = self._initial_inventories(agent_names, object_types, difficulty, template)
+        # The only copy: transfer generation then mutates ``inventories`` in
+        # place, leaving it as the final state.
+        initial = {name: holdings.copy() for name, holdings in inventories.items()}
 
         graph, graph_type = self.graph_builder.build(agent_names, target_transfers)
         transfers = self._generate_transfers(
@@ -124,7 +233,7 @@ class ScenarioGenerator:
             target_transfers,
             template.max_quantity,
         )
-        agents = self._finalize_agents(agent_names, inventories, transfers)
+        agents = self._finalize_agents(agent_names, initial, inventories)
 
         metrics = graph_metrics(graph)
         scenario_params = {
@@ -176,37 +285,41 @@ class ScenarioGenerator:
         for category, items in DEFAULT_OBJECTS.items():
             if category in self.config.objects.categories:
                 catalog.extend(items)
-        catalog.extend(self.config.objects.custom_objects)
+        # Config-loaded names are fresh strings; intern them like the literals.
+        catalog.extend(sys.intern(obj) for obj in self.config.objects.custom_objects)
+        # Custom objects may repeat catalog entries; keep first occurrences only.
+        catalog = list(dict.fromkeys(catalog))
         return catalog or list(itertools.chain.from_iterable(DEFAULT_OBJECTS.values()))
 
     def _sample_agents(self, count: int) -> List[str]:
         if count <= len(self.agent_pool):
             return self.rng.sample(self.agent_pool, count)
-        names = self.agent_pool[:]
+        names = list(self.agent_pool)
         idx = 1
         while len(names) < count:
-            names.append(f"Agent{idx}")
+            names.append(sys.intern(f"Agent{idx}"))
             idx += 1
         self.rng.shuffle(names)
         return names[:count]
 
-    def _sample_objects(self, count: int) -> List[str]:
+    def _build_object_pool(self) -> List[str]:
+        """Pool objects are drawn from: the preferred category if set, else the catalog."""
         if self.config.objects.category_preference:
             preferred = DEFAULT_OBJECTS.get(self.config.objects.category_preference, [])
             if preferred:
-                pool = preferred + self.config.objects.custom_objects
-                return self._draw_from_pool(pool, count)
-        return self._draw_from_pool(self.object_catalog, count)
+                custom = [sys.intern(obj) for obj in self.config.objects.custom_objects]
+                return list(dict.fromkeys(preferred + custom))
+        return self.object_catalog
+
+    def _sample_objects(self, count: int) -> List[str]:
+        return self._draw_from_pool(self.object_pool, count)
 
     def _draw_from_pool(self, pool: List[str], count: int) -> List[str]:
         if not pool:
             return []
-        if count <= len(pool):
-            return self.rng.sample(pool, count)
-        choices: List[str] = []
-        while len(choices) < count:
-            choices.append(self.rng.choice(pool))
-        return choices
+        # Drawing with replacement would repeat object types within a scenario,
+        # so a short pool caps the count instead.
+        return self.rng.sample(pool, min(count, len(pool)))
 
     # ------------------------------------------------------------------
     def _initial_inventories(
@@ -221,6 +334,8 @@ class ScenarioGenerator:
         probs = cfg.probabilities
         multiplier = inventory_cfg.difficulty_multipliers.get(difficulty, 1.0)
         max_base = int(inventory_cfg.max_initial_base * multiplier)
+        if len(agents) * len(objects) >= VECTORIZED_INVENTORY_MIN_CELLS:
+            return self._initial_inventories_vectorized(agents, objects, max_base, template)
 
         inventories: Dict[str, Dict[str, int]] = {}
         for agent in agents:
@@ -239,6 +354,31 @@ class ScenarioGenerator:
             inventories[agent] = holdings
         return inventories
 
+    def _initial_inventories_vectorized(
+        self,
+        agents: List[str],
+        objects: List[str],
+        max_base: int,
+        template: DifficultyTemplate,
+    ) -> Dict[str, Dict[str, int]]:
+        """Same distribution as the scalar path, drawn as whole arrays.
+
+        The NumPy generator is seeded from ``self.rng`` so output stays
+        reproducible for a given scenario seed.
+        """
+        cfg = self.config.generation
+        probs = cfg.probabilities
+        shape = (len(agents), len(objects))
+        gen = np.random.default_rng(self.rng.getrandbits(64))
+
+        buffers = gen.integers(*cfg.inventory.buffer_range, size=(shape[0], 1), endpoint=True)
+        present = gen.random(shape) <= probs.object_presence
+        small = gen.random(shape) < probs.small_quantity
+        uppers = np.where(small, max(2, max_base // 2), max(2, max_base))
+        quantities = np.minimum(buffers + gen.integers(1, uppers, endpoint=True), template.max_quantity)
+        quantities[~present] = 0
+        return {agent: dict(zip(objects, row)) for agent, row in zip(agents, quantities.tolist())}
+
     # ------------------------------------------------------------------
     def _generate_transfers(
         self,
@@ -255,17 +395,25 @@ class ScenarioGenerator:
         transfers: List[Transfer] = []
         limits = self.config.generation.limits
         max_attempts = limits.max_transfer_attempts * max(1, target_transfers)
+        # Objects each agent can still give, kept in step with inventories so
+        # the sender's object is drawn only from cells with stock.
+        stocked = {name: [obj for obj in objects if inventories[name][obj] > 0] for name in agents}
         attempts = 0
         step = 0
         while len(transfers) < target_transfers and attempts < max_attempts:
             sender, receiver = edges[step % len(edges)]
-            obj = self.rng.choice(objects)
-            available = inventories[sender][obj]
-            if available <= 0 or sender == receiver:
+            candidates = stocked[sender]
+            if not candidates or sender == receiver:
                 attempts += 1
                 step += 1
                 continue
+            obj = self.rng.choice(candidates)
+            available = inventories[sender][obj]
             quantity = self.rng.randint(1, min(available, max_quantity))
+            if quantity == available:
+                candidates.remove(obj)
+            if inventories[receiver][obj] <= 0:
+                stocked[receiver].append(obj)
             inventories[sender][obj] -= quantity
             inventories[receiver][obj] += quantity
             transfers.append(
@@ -283,14 +431,10 @@ class ScenarioGenerator:
     def _finalize_agents(
         self,
         agent_names: List[str],
-        inventories: Dict[str, Dict[str, int]],
-        transfers: List[Transfer],
+        initial: Dict[str, Dict[str, int]],
+        final: Dict[str, Dict[str, int]],
     ) -> List[Agent]:
-        final = {name: holdings.copy() for name, holdings in inventories.items()}
-        for transfer in transfers:
-            final[transfer.from_agent][transfer.object_type] -= transfer.quantity
-            final[transfer.to_agent][transfer.object_type] += transfer.quantity
-        return [Agent(name=name, initial_inventory=inventories[name], final_inventory=final[name]) for name in agent_names]
+        return [Agent(name=name, initial_inventory=initial[name], final_inventory=final[name]) for name in agent_names]
 
     # ------------------------------------------------------------------
     def _complexity_score(self, scenario_params: Dict[str, float], metrics: Dict[str, float]) -> float:
@@ -307,6 +451,30 @@ class ScenarioGenerator:
         return round(score, 2)
 
 
+def spawn_seeds(rng: random.Random, count: int) -> List[int]:
+    """Independent per-scenario seeds.
+
+    Spawned through one ``SeedSequence`` rooted in ``rng``. Each child is
+    truncated to 64 bits, so collisions are vanishingly unlikely, unlike
+    independent 32-bit draws at dataset scale, though not impossible.
+    """
+    root = np.random.SeedSequence(rng.getrandbits(128))
+    return [int(child.generate_state(1, np.uint64)[0]) for child in root.spawn(count)]
+
+
+# One generator per worker process, reseeded for each scenario.
+_worker_generator: Optional[ScenarioGenerator] = None
+
+
+def _init_scenario_worker(config: Config) -> None:
+    global _worker_generator
+    _worker_generator = ScenarioGenerator(config)
+
+
+def _scenario_worker(seed: int, scenario_id: int, difficulty: str) -> Scenario:
+    return _worker_generator._seeded_scenario(seed, scenario_id, difficulty)
+
+
 #alias Backward-compatible 
 ScenarioFactory = ScenarioGenerator
 
@@ -3,70 +3,130 @@
 from __future__ import annotations
 
 import random
-from typing import Iterable, List
+from functools import lru_cache
+from itertools import chain, islice
+from typing import Iterable, List, Optional
 
 from .scenario import Scenario, Transfer
 
+# Singular nouns that already end in "s" and must not lose it.
+_S_ENDING_EXCEPTIONS = frozenset({"glass", "class", "mass", "pass"})
+# Plurals whose singular is not the plural minus "s" ("cookies" is).
+_IRREGULAR_SINGULARS = {
+    "candies": "candy",
+    "sandwiches": "sandwich",
+    "wrenches": "wrench",
+    "brushes": "brush",
+}
+_IRREGULAR_PLURALS = {singular: plural for plural, singular in _IRREGULAR_SINGULARS.items()}
+_VOWELS = frozenset("aeiou")
+
+
+def pluralize(noun: str, count: int) -> str:
+    return _inflect(noun, count == 1)
+
+
+def join_sentences(sentences: List[str]) -> str:
+    if not sentences:
+        return ""
+    return " ".join(sentences)
+
+
+def compose_question(sentences: List[str], question_text: str) -> str:
+    """Context followed by the question, built with a single join."""
+    return " ".join(chain(sentences or ("",), (question_text,)))
+
+
+def vague_quantity(count: int) -> str:
+    return _vague_label(count)
+
 
 class TextProcessor:
-    TRANSFER_VERBS = ["gives", "shares", "hands over", "passes", "transfers"]
-    CONNECTORS = ["After that", "Then", "Later", "Meanwhile", "Next"]
-    VAGUE_MAP = [(0, "no"), (1, "a"), (3, "a few"), (7, "several"), (15, "many"), (1000, "numerous")]
+    TRANSFER_VERBS = ("gives", "shares", "hands over", "passes", "transfers")
+    CONNECTORS = ("After that", "Then", "Later", "Meanwhile", "Next")
+    VAGUE_MAP = ((0, "no"), (1, "a"), (3, "a few"), (7, "several"), (15, "many"), (1000, "numerous"))
 
     def __init__(self, seed: int | None = None) -> None:
         self.rng = random.Random(seed)
+        self._described_scenario: Optional[Scenario] = None
+        self._initial_sentences: List[str] = []
 
-    # ------------------------------------------------------------------
-    def pluralize(self, noun: str, count: int) -> str:
-        if count == 1:
-            if noun.endswith("s"):
-                return noun[:-1]
-            if noun.endswith("ies"):
-                return noun[:-3] + "y"
-            return noun
-        if noun.endswith("y"):
-            return noun[:-1] + "ies"
-        if noun.endswith("s"):
-            return noun
-        return noun + "s"
+    # String-only helpers live at module scope; these keep the old spelling.
+    pluralize = staticmethod(pluralize)
+    join_sentences = staticmethod(join_sentences)
+    compose_question = staticmethod(compose_question)
+    vague_quantity = staticmethod(vague_quantity)
 
     # ------------------------------------------------------------------
     def describe_initial_state(self, scenario: Scenario) -> List[str]:
+        # Deterministic per scenario, so every question on it shares one copy.
+        if scenario is not self._described_scenario:
+            self._initial_sentences = self._initial_state_sentences(scenario)
+            self._described_scenario = scenario
+        return list(self._initial_sentences)
+
+    def _initial_state_sentences(self, scenario: Scenario) -> List[str]:
         sentences: List[str] = []
+        append = sentences.append
+        fmt = self.format_item_list
         for agent in scenario.agents:
             holdings = [
-                f"{count} {self.pluralize(obj, count)}"
+                f"{count} {_inflect(obj, count == 1)}"
                 for obj, count in agent.initial_inventory.items()
                 if count > 0
             ]
             if holdings:
-                if len(holdings) == 1:
-                    bundle = holdings[0]
-                else:
-                    bundle = ", ".join(holdings[:-1]) + f" and {holdings[-1]}"
-                sentences.append(f"{agent.name} has {bundle}.")
+                append(f"{agent.name} has {fmt(holdings)}.")
         return sentences
 
+    @staticmethod
+    def format_item_list(items: List[str]) -> str:
+        """``a``, ``a and b``, ``a, b and c`` without copying the head slice."""
+        if len(items) == 1:
+            return items[0]
+        head = ", ".join(islice(items, len(items) - 1))
+        return f"{head} and {items[-1]}"
+
     def describe_transfers(self, transfers: Iterable[Transfer]) -> List[str]:
-        sentences: List[str] = []
-        for transfer in transfers:
-            verb = self.rng.choice(self.TRANSFER_VERBS)
-            obj = self.pluralize(transfer.object_type, transfer.quantity)
-            connector = self.rng.choice(self.CONNECTORS)
-            sentences.append(
-                f"{connector}, {transfer.from_agent} {verb} {transfer.quantity} {obj} to {transfer.to_agent}."
-            )
-        return sentences
+        transfers = list(transfers)
+        # Draw every verb and connector for the story in two batched calls.
+        verbs = self.rng.choices(self.TRANSFER_VERBS, k=len(transfers))
+        connectors = self.rng.choices(self.CONNECTORS, k=len(transfers))
+        return [
+            self._describe_transfer(transfer, verb, connector)
+            for transfer, verb, connector in zip(transfers, verbs, connectors)
+        ]
+
+    def _describe_transfer(self, transfer: Transfer, verb: str, connector: str) -> str:
+        obj = _inflect(transfer.object_type, transfer.quantity == 1)
+        return f"{connector}, {transfer.from_agent} {verb} {transfer.quantity} {obj} to {transfer.to_agent}."
 
     def build_story(self, scenario: Scenario) -> List[str]:
         return self.describe_initial_state(scenario) + self.describe_transfers(scenario.transfers)
-    def join_sentences(self, sentences: List[str]) -> str:
-        if not sentences:
-            return ""
-        return " ".join(sentences)
-
-    def vague_quantity(self, count: int) -> str:
-        for threshold, label in self.VAGUE_MAP:
-            if count <= threshold:
-                return label
-        return self.VAGUE_MAP[-1][1]
+
+
+@lru_cache(maxsize=1024)
+def _inflect(noun: str, singular: bool) -> str:
+    if singular:
+        if noun in _IRREGULAR_SINGULARS:
+            return _IRREGULAR_SINGULARS[noun]
+        if noun.endswith("s") and noun not in _S_ENDING_EXCEPTIONS:
+            return noun[:-1]
+        return noun
+    if noun in _IRREGULAR_PLURALS:
+        return _IRREGULAR_PLURALS[noun]
+    if noun.endswith("y") and noun[-2:-1] not in _VOWELS:
+        return noun[:-1] + "ies"
+    if noun in _S_ENDING_EXCEPTIONS:
+        return noun + "es"
+    if noun.endswith("s"):
+        return noun
+    return noun + "s"
+
+
+@lru_cache(maxsize=256)
+def _vague_label(count: int) -> str:
+    for threshold, label in TextProcessor.VAGUE_MAP:
+        if count <= threshold:
+            return label
+    return TextProcessor.VAGUE_MAP[-1][1]
@@ -4,6 +4,7 @@
 from __future__ import annotations
 
 import argparse
+import logging
 import random
 from datetime import datetime
 from pathlib import Path
@@ -12,6 +13,8 @@ import numpy as np
 
 from awp import DatasetManager, QuestionGenerator, load_config
 
+log = logging.getLogger("generate_dataset")
+
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Generate arithmetic word problem datasets")
@@ -42,6 +45,7 @@ def describe_config(config) -> None:
 def main() -> None:
     args = parse_args()
     config = load_config(args.config)
+    logging.basicConfig(level=config.meta.logging_level, format="%(levelname)s: %(message)s")
 
     if args.validate_only:
         describe_config(config)
@@ -102,9 +106,10 @@ def main() -> None:
 
     if config.output.enable_validation and not args.quiet:
         issues = manager.validate(questions)
+        issues.update(manager.validate_scenarios(scenarios))
         for key, ids in issues.items():
             if ids:
-                print(f"Warning: {key} -> {len(ids)} issues")
+                log.warning("%s -> %d issues", key, len(ids))
 
 
 if __name__ == "__main__":
@@ -106,6 +106,7 @@ def main() -> None:
     print_summary(manager, questions, args.samples)
 
     issues = manager.validate(questions)
+    issues.update(manager.validate_scenarios(scenarios))
     outstanding = {k: v for k, v in issues.items() if v}
     if outstanding:
         print("\nValidation warnings:")